@@ -8,6 +8,7 @@ from signal import SIGINT
 from signal import SIGQUIT
 from signal import SIGTERM
 import httpx
+import uvloop
 from eth_utils.address import to_checksum_address
 from web3 import Web3
 import sys
@@ -404,11 +405,19 @@ class EventDetectorProcess(multiprocessing.Process):
         for signame in [signal.SIGINT, signal.SIGTERM, signal.SIGQUIT]:
             signal.signal(signame, self._generic_exit_handler)
 
+        # the event detector and the snapshot worker it drives are I/O bound, run them on libuv
+        uvloop.install()
         self.ev_loop = asyncio.get_event_loop()
 
-        self.ev_loop.run_until_complete(
-            self._detect_events(),
-        )
+        try:
+            self.ev_loop.run_until_complete(
+                self._detect_events(),
+            )
+        finally:
+            # aiohttp warns about sessions left open at exit
+            self.ev_loop.run_until_complete(
+                self.processor_distributor.snapshot_worker.close(),
+            )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+import random
+
+from coincurve import PrivateKey
+from eip712_structs import EIP712Struct
+from eip712_structs import make_domain
+from eip712_structs import String
+from eip712_structs import Uint
+from eth_hash.auto import keccak
+from eth_utils.encoding import big_endian_to_int
+
+from snapshotter.utils.eip712 import eip712_domain_separator
+from snapshotter.utils.eip712 import eip_request_digest
+from snapshotter.utils.eip712 import EIP_REQUEST_TYPE_HASH
+from snapshotter.utils.eip712 import encode_eip_request
+from snapshotter.utils.eip712 import sign_eip712_digest
+
+
+# reference struct definition, the hand rolled encoder must produce the same bytes
+class EIPRequest(EIP712Struct):
+    slotId = Uint()
+    deadline = Uint()
+    snapshotCid = String()
+    epochId = Uint()
+    projectId = String()
+
+
+def _random_domain_args(rng):
+    return {
+        'name': 'PowerloomProtocolContract',
+        'version': '0.1',
+        'chain_id': rng.getrandbits(32),
+        'verifying_contract': '0x' + rng.randbytes(20).hex(),
+    }
+
+
+def _random_request_args(rng):
+    return {
+        'slot_id': rng.getrandbits(16),
+        'deadline': rng.getrandbits(64),
+        'snapshot_cid': 'bafkrei' + rng.randbytes(26).hex(),
+        'epoch_id': rng.getrandbits(64),
+        'project_id': f'pairContract_trade_volume:0x{rng.randbytes(20).hex()}:UNISWAPV2-ÜNICODE',
+    }
+
+
+def _reference_domain(domain_args):
+    return make_domain(
+        name=domain_args['name'], version=domain_args['version'], chainId=domain_args['chain_id'],
+        verifyingContract=domain_args['verifying_contract'],
+    )
+
+
+def _reference_request(request_args):
+    return EIPRequest(
+        slotId=request_args['slot_id'],
+        deadline=request_args['deadline'],
+        snapshotCid=request_args['snapshot_cid'],
+        epochId=request_args['epoch_id'],
+        projectId=request_args['project_id'],
+    )
+
+
+def test_eip_request_type_hash():
+    assert EIP_REQUEST_TYPE_HASH == EIPRequest.type_hash()
+
+
+def test_domain_separator():
+    rng = random.Random(712)
+    for _ in range(50):
+        domain_args = _random_domain_args(rng)
+        assert eip712_domain_separator(**domain_args) == _reference_domain(domain_args).hash_struct()
+
+
+def test_encode_eip_request():
+    rng = random.Random(713)
+    for _ in range(50):
+        domain_args = _random_domain_args(rng)
+        request_args = _random_request_args(rng)
+        domain = _reference_domain(domain_args)
+        request = _reference_request(request_args)
+
+        encoded_fields = encode_eip_request(**request_args)
+        assert encoded_fields == request.encode_value()
+
+        signing_prefix = b'\x19\x01' + eip712_domain_separator(**domain_args)
+        assert eip_request_digest(signing_prefix, encoded_fields) == keccak(request.signable_bytes(domain))
+
+
+def test_signature_matches_legacy_signing():
+    rng = random.Random(714)
+    for _ in range(50):
+        private_key = PrivateKey(rng.randbytes(32))
+        domain_args = _random_domain_args(rng)
+        request_args = _random_request_args(rng)
+
+        # signing path used before the hand rolled encoder: coincurve hashes the signable bytes itself
+        signature = private_key.sign_recoverable(
+            _reference_request(request_args).signable_bytes(_reference_domain(domain_args)),
+            hasher=keccak,
+        )
+        v = signature[64] + 27
+        r = big_endian_to_int(signature[0:32])
+        s = big_endian_to_int(signature[32:64])
+        legacy_sig = r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
+
+        signing_prefix = b'\x19\x01' + eip712_domain_separator(**domain_args)
+        digest = eip_request_digest(signing_prefix, encode_eip_request(**request_args))
+        assert sign_eip712_digest(private_key, digest) == legacy_sig
@@ -0,0 +1,86 @@
+from coincurve import PrivateKey
+from eth_hash.auto import keccak
+
+
+EIP712_DOMAIN_TYPE_HASH = keccak(
+    b'EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)',
+)
+EIP_REQUEST_TYPE_HASH = keccak(
+    b'EIPRequest(uint256 slotId,uint256 deadline,string snapshotCid,uint256 epochId,string projectId)',
+)
+
+
+def eip712_domain_separator(name: str, version: str, chain_id: int, verifying_contract: str) -> bytes:
+    """
+    Computes the EIP-712 domain separator, i.e. the struct hash of an EIP712Domain.
+
+    Args:
+        name (str): The name of the signing domain.
+        version (str): The version of the signing domain.
+        chain_id (int): The chain ID of the chain the verifying contract is deployed on.
+        verifying_contract (str): The 0x prefixed address of the verifying contract.
+
+    Returns:
+        bytes: The 32 byte domain separator.
+    """
+    return keccak(
+        EIP712_DOMAIN_TYPE_HASH +
+        keccak(name.encode('utf-8')) +
+        keccak(version.encode('utf-8')) +
+        chain_id.to_bytes(32, 'big') +
+        bytes.fromhex(verifying_contract[2:]).rjust(32, b'\x00'),
+    )
+
+
+def encode_eip_request(slot_id: int, deadline: int, snapshot_cid: str, epoch_id: int, project_id: str) -> bytes:
+    """
+    EIP-712 encodes the fields of an EIPRequest struct, i.e. its struct hash preimage without the type hash.
+
+    Args:
+        slot_id (int): The slot ID of the snapshotter.
+        deadline (int): The anchor chain block number until which the submission is valid.
+        snapshot_cid (str): The CID of the snapshot.
+        epoch_id (int): The epoch ID of the snapshot.
+        project_id (str): The project ID of the snapshot.
+
+    Returns:
+        bytes: The 5 * 32 byte encoded fields, in declaration order.
+    """
+    # uint256 fields are 32 byte big endian words, dynamic strings are encoded as the keccak hash of their contents
+    return (
+        slot_id.to_bytes(32, 'big') +
+        deadline.to_bytes(32, 'big') +
+        keccak(snapshot_cid.encode('utf-8')) +
+        epoch_id.to_bytes(32, 'big') +
+        keccak(project_id.encode('utf-8'))
+    )
+
+
+def eip_request_digest(signing_prefix: bytes, encoded_fields: bytes) -> bytes:
+    """
+    Computes the EIP-712 digest of an EIPRequest, the 32 byte hash that gets signed.
+
+    Args:
+        signing_prefix (bytes): The constant 0x1901 || domain separator prefix.
+        encoded_fields (bytes): The encoded request fields, as returned by `encode_eip_request`.
+
+    Returns:
+        bytes: The 32 byte digest.
+    """
+    return keccak(signing_prefix + keccak(EIP_REQUEST_TYPE_HASH + encoded_fields))
+
+
+def sign_eip712_digest(private_key: PrivateKey, digest: bytes) -> bytes:
+    """
+    Signs an EIP-712 digest and returns the signature in the r || s || v layout expected by the protocol state contract.
+
+    Args:
+        private_key (PrivateKey): The key to sign with.
+        digest (bytes): The 32 byte digest, it is signed as is without hashing it again.
+
+    Returns:
+        bytes: The 65 byte signature, v being the recovery id shifted by 27.
+    """
+    signature = private_key.sign_recoverable(digest, hasher=None)
+    # coincurve returns the compact r || s || recovery id layout, only v needs to be shifted by 27
+    return signature[:64] + bytes([signature[64] + 27])
@@ -3,17 +3,16 @@ import json
 import sys
 import time
 from typing import Dict
+from typing import Set
 from typing import Union
+import aiohttp
 import grpclib
-import httpx
-import sha3
+import orjson
 import tenacity
+import uvloop
 from coincurve import PrivateKey
-from eip712_structs import EIP712Struct
 from eip712_structs import make_domain
-from eip712_structs import String
-from eip712_structs import Uint
-from eth_utils.encoding import big_endian_to_int
+from eth_hash.auto import keccak
 from grpclib.client import Channel
 from httpx import AsyncClient
 from httpx import AsyncHTTPTransport
@@ -31,11 +30,16 @@ from tenacity import wait_random_exponential
 from web3 import Web3
 
 from snapshotter.settings.config import settings
+from snapshotter.utils.callback_helpers import misc_notification_callback_result_handler
 from snapshotter.utils.callback_helpers import send_failure_notifications_async
 from snapshotter.utils.callback_helpers import send_failure_notifications_sync
 from snapshotter.utils.callback_helpers import send_telegram_notification_async
 from snapshotter.utils.callback_helpers import send_telegram_notification_sync
 from snapshotter.utils.default_logger import logger
+from snapshotter.utils.eip712 import eip712_domain_separator
+from snapshotter.utils.eip712 import eip_request_digest
+from snapshotter.utils.eip712 import encode_eip_request
+from snapshotter.utils.eip712 import sign_eip712_digest
 from snapshotter.utils.file_utils import read_json_file
 from snapshotter.utils.models.data_models import SnapshotterIssue
 from snapshotter.utils.models.data_models import SnapshotterReportState
@@ -52,14 +56,6 @@ from snapshotter.utils.rpc import RpcHelper
 import grpclib
 
 
-class EIPRequest(EIP712Struct):
-    slotId = Uint()
-    deadline = Uint()
-    snapshotCid = String()
-    epochId = Uint()
-    projectId = String()
-
-
 def web3_storage_retry_state_callback(retry_state: tenacity.RetryCallState):
     """
     Callback function to handle retry attempts for web3 storage upload.
@@ -111,10 +107,12 @@ def ipfs_upload_retry_state_callback(retry_state: tenacity.RetryCallState):
 class GenericAsyncWorker:
     _rpc_helper: RpcHelper
     _anchor_rpc_helper: RpcHelper
+    _notification_transport: AsyncHTTPTransport
     _reporting_httpx_client: AsyncClient
     _telegram_httpx_client: AsyncClient
-    _web3_storage_upload_transport: AsyncHTTPTransport
-    _web3_storage_upload_client: AsyncClient
+    _web3_storage_upload_connector: aiohttp.TCPConnector
+    _web3_storage_upload_client: aiohttp.ClientSession
+    _web3_storage_sem: asyncio.Semaphore
     _grpc_channel: Channel
     _grpc_stub: SubmissionStub
 
@@ -127,12 +125,19 @@ class GenericAsyncWorker:
             **kwargs: Additional keyword arguments to pass to the superclass constructor.
         """
         self._running_callback_tasks: Dict[str, asyncio.Task] = dict()
+        # the event loop only keeps weak references to tasks, fire and forget tasks are held here until they finish
+        self._background_tasks: Set[asyncio.Task] = set()
         self.protocol_state_contract = None
 
         self.protocol_state_contract_address = settings.protocol_state.address
         self.initialized = False
         self.logger = logger.bind(module='GenericAsyncWorker')
         self.status = SnapshotterStatus(projects=[])
+        # fields of missed snapshot issue reports that don't change over the lifetime of the worker
+        self._issue_template = {
+            'instanceID': settings.instance_id,
+            'issueType': SnapshotterReportState.MISSED_SNAPSHOT.value,
+        }
 
     def _notification_callback_result_handler(self, fut: asyncio.Future):
         """
@@ -165,7 +170,7 @@ class GenericAsyncWorker:
             r = None
         else:
             try:
-                r = r.json()
+                r = orjson.loads(r.content)
             except:
                 r = str(r)
         return r, exc, req_json['epochId'], req_json['projectId'], req_json['slotId']
@@ -173,7 +178,7 @@ class GenericAsyncWorker:
     @retry(
         wait=wait_random_exponential(multiplier=1, max=10),
         stop=stop_after_attempt(5),
-        retry=tenacity.retry_if_not_exception_type(httpx.HTTPStatusError),
+        retry=tenacity.retry_if_not_exception_type(aiohttp.ClientResponseError),
         after=web3_storage_retry_state_callback,
     )
     async def _upload_web3_storage(self, snapshot: bytes):
@@ -187,19 +192,20 @@ class GenericAsyncWorker:
             None
 
         Raises:
-            HTTPError: If the upload fails.
+            ClientResponseError: If the upload fails.
         """
-        web3_storage_settings = settings.web3storage
         # if no api token is provided, skip
-        if not web3_storage_settings.api_token:
+        if not self._ws_token:
             return
-        files = {'file': snapshot}
-        r = await self._web3_storage_upload_client.post(
-            url=f'{web3_storage_settings.url}{web3_storage_settings.upload_url_suffix}',
-            files=files,
-        )
-        r.raise_for_status()
-        resp = r.json()
+        # send the payload as the raw request body, avoiding a multipart encoded copy of it
+        async with self._web3_storage_upload_client.post(
+            url=self._ws_url,
+            data=snapshot,
+            headers={'Content-Type': 'application/octet-stream'},
+            allow_redirects=False,
+        ) as r:
+            r.raise_for_status()
+            resp = orjson.loads(await r.read())
         self.logger.info('Uploaded snapshot to web3 storage: {} | Response: {}', snapshot, resp)
 
     @retry(
@@ -227,7 +233,8 @@ class GenericAsyncWorker:
         self.logger.debug(
             'Sending submission to collector...',
         )
-        request_, signature, current_block_hash = await self.generate_signature(snapshot_cid, epoch_id, project_id, settings.slot_id, settings.signer_private_key)
+        # signs with the worker's identity key, which is loaded from settings.signer_private_key once on init
+        request_, signature, current_block_hash = await self.generate_signature(snapshot_cid, epoch_id, project_id, self._default_slot_id)
 
         request_msg = Request(
             slotId=request_['slotId'],
@@ -318,13 +325,26 @@ class GenericAsyncWorker:
             storage_flag (bool): Whether to upload the snapshot to web3 storage.
 
         Returns:
-            snapshot_cid (str): The CID of the uploaded snapshot.
+            snapshot_cid (str): The CID of the uploaded snapshot, None if the IPFS upload failed.
         """
-        # upload to IPFS
-        snapshot_json = json.dumps(snapshot.dict(by_alias=True), sort_keys=True, separators=(',', ':'))
-        snapshot_bytes = snapshot_json.encode('utf-8')
+        snapshot_cid = None
+        # failures are counted and reported here, callers only need to handle errors raised while reporting them
         try:
-            if settings.ipfs.url:
+            # the CID is derived from these bytes, keep the stdlib encoding so it stays identical across snapshotters
+            snapshot_json = json.dumps(snapshot.dict(by_alias=True), sort_keys=True, separators=(',', ':'))
+            snapshot_bytes = snapshot_json.encode('utf-8')
+            # upload to web3 storage, it only needs the payload so it overlaps with the IPFS upload and collector submission
+            if storage_flag:
+                # take an upload slot before scheduling, so a burst of snapshots waits here instead of
+                # piling up queued tasks that each hold on to their payload
+                await self._web3_storage_sem.acquire()
+                storage_task = asyncio.create_task(self._upload_web3_storage(snapshot_bytes))
+                self._background_tasks.add(storage_task)
+                storage_task.add_done_callback(self._background_tasks.discard)
+                storage_task.add_done_callback(lambda _: self._web3_storage_sem.release())
+                storage_task.add_done_callback(misc_notification_callback_result_handler)
+            # upload to IPFS
+            if self._ipfs_enabled:
                 snapshot_cid = await self._upload_to_ipfs(snapshot_bytes, _ipfs_writer_client)
             else:
                 snapshot_cid = cid_sha256_hash(snapshot_bytes)
@@ -361,10 +381,6 @@ class GenericAsyncWorker:
                 self.status.consecutiveMissedSubmissions = 0
                 self.status.totalSuccessfulSubmissions += 1
 
-        # upload to web3 storage
-        if storage_flag:
-            asyncio.ensure_future(self._upload_web3_storage(snapshot_bytes))
-
         return snapshot_cid
 
     async def _init_rpc_helper(self):
@@ -373,11 +389,15 @@ class GenericAsyncWorker:
         """
         self._rpc_helper = RpcHelper(rpc_settings=settings.rpc)
         self._anchor_rpc_helper = RpcHelper(rpc_settings=settings.anchor_chain_rpc)
+        self._data_market_cs = Web3.to_checksum_address(settings.data_market)
+        self._protocol_state_cs = Web3.to_checksum_address(self.protocol_state_contract_address)
+        # calldata for the protocol state getters is constant, encode it once: selector + left padded data market address
+        encoded_data_market = bytes.fromhex(self._data_market_cs[2:]).rjust(32, b'\x00')
+        self._source_block_time_calldata = keccak(b'SOURCE_CHAIN_BLOCK_TIME(address)')[:4] + encoded_data_market
+        self._epoch_size_calldata = keccak(b'EPOCH_SIZE(address)')[:4] + encoded_data_market
 
         self.protocol_state_contract = self._anchor_rpc_helper.get_current_node()['web3_client'].eth.contract(
-            address=Web3.to_checksum_address(
-                self.protocol_state_contract_address,
-            ),
+            address=self._protocol_state_cs,
             abi=read_json_file(
                 settings.protocol_state.abi,
                 self.logger,
@@ -385,75 +405,101 @@ class GenericAsyncWorker:
         )
 
         self._anchor_chain_id = self._anchor_rpc_helper.get_current_node()['web3_client'].eth.chain_id
-        self._keccak_hash = lambda x: sha3.keccak_256(x).digest()
-        self._domain_separator = make_domain(
+        # the domain separator is constant for the lifetime of the worker
+        self._domain_sep_bytes = eip712_domain_separator(
+            name='PowerloomProtocolContract', version='0.1', chain_id=self._anchor_chain_id,
+            verifying_contract=self._protocol_state_cs,
+        )
+        # sanity check the precomputed separator against eip712_structs to catch encoding or config drift
+        reference_domain_sep_bytes = make_domain(
             name='PowerloomProtocolContract', version='0.1', chainId=self._anchor_chain_id,
             verifyingContract=self.protocol_state_contract_address,
-        )
+        ).hash_struct()
+        if self._domain_sep_bytes != reference_domain_sep_bytes:
+            raise Exception(
+                f'Precomputed EIP-712 domain separator {self._domain_sep_bytes.hex()} does not match '
+                f'eip712_structs domain separator {reference_domain_sep_bytes.hex()}',
+            )
+        self._sig_prefix = b'\x19\x01' + self._domain_sep_bytes
         self._private_key = settings.signer_private_key
         if self._private_key.startswith('0x'):
             self._private_key = self._private_key[2:]
         self._identity_private_key = PrivateKey.from_hex(settings.signer_private_key)
 
     async def generate_signature(self, snapshot_cid, epoch_id, project_id, slot_id=None, private_key=None):
-        current_block = await self._anchor_rpc_helper.eth_get_block()
+        # only the deadline depends on the current block, the block request is scheduled first and the rest of the
+        # fields are encoded before waiting on it
+        block_task = asyncio.create_task(self._anchor_rpc_helper.eth_get_block())
+        try:
+            request_slot_id = self._default_slot_id if not slot_id else slot_id
+            # encode with a placeholder deadline, its 32 byte word is substituted once the block is known
+            partial_encoded_fields = encode_eip_request(request_slot_id, 0, snapshot_cid, epoch_id, project_id)
+            current_block = await block_task
+        except BaseException:
+            # don't leave the block request running if encoding fails or this coroutine is cancelled
+            block_task.cancel()
+            raise
         current_block_number = int(current_block['number'], 16)
         current_block_hash = current_block['hash']
-        deadline = current_block_number + settings.protocol_state.deadline_buffer
-        request_slot_id = settings.slot_id if not slot_id else slot_id
-        request = EIPRequest(
-            slotId=request_slot_id,
-            deadline=deadline,
-            snapshotCid=snapshot_cid,
-            epochId=epoch_id,
-            projectId=project_id,
-        )
-
-        signable_bytes = request.signable_bytes(self._domain_separator)
+        deadline = current_block_number + self._deadline_buffer
+        encoded_fields = partial_encoded_fields[:32] + deadline.to_bytes(32, 'big') + partial_encoded_fields[64:]
+        msg_hash = eip_request_digest(self._sig_prefix, encoded_fields)
         if not private_key:
-            signature = self._identity_private_key.sign_recoverable(signable_bytes, hasher=self._keccak_hash)
+            final_sig = sign_eip712_digest(self._identity_private_key, msg_hash)
         else:
             if private_key.startswith('0x'):
                 private_key = private_key[2:]
             signer_private_key = PrivateKey.from_hex(private_key)
-            signature = signer_private_key.sign_recoverable(signable_bytes, hasher=self._keccak_hash)
-        v = signature[64] + 27
-        r = big_endian_to_int(signature[0:32])
-        s = big_endian_to_int(signature[32:64])
-
-        final_sig = r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
+            final_sig = sign_eip712_digest(signer_private_key, msg_hash)
         request_ = {'slotId': request_slot_id, 'deadline': deadline, 'snapshotCid': snapshot_cid, 'epochId': epoch_id, 'projectId': project_id}
         return request_, final_sig, current_block_hash
 
     async def _init_httpx_client(self):
         """
-        Initializes the HTTPX client and transport objects for making HTTP requests.
+        Initializes the HTTPX clients used for notifications and the aiohttp session used for web3 storage uploads.
         """
+        # reporting and telegram clients share a single connection pool, HTTP/2 is negotiated where the host supports it
+        self._notification_transport = AsyncHTTPTransport(
+            http2=True,
+            limits=Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=None),
+        )
         self._reporting_httpx_client = AsyncClient(
             base_url=settings.reporting.service_url,
             timeout=Timeout(timeout=5.0),
             follow_redirects=False,
-            transport=AsyncHTTPTransport(limits=Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=None)),
+            transport=self._notification_transport,
         )
         self._telegram_httpx_client = AsyncClient(
             base_url=settings.reporting.telegram_url,
             timeout=Timeout(timeout=5.0),
             follow_redirects=False,
-            transport=AsyncHTTPTransport(limits=Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=None)),
+            transport=self._notification_transport,
         )
-        self._web3_storage_upload_transport = AsyncHTTPTransport(
-            limits=Limits(
-                max_connections=200,
-                max_keepalive_connections=settings.web3storage.max_idle_conns,
-                keepalive_expiry=settings.web3storage.idle_conn_timeout,
-            ),
+        # snapshot uploads are the bulk of the outgoing HTTP traffic, aiohttp parses responses with its C extension
+        self._web3_storage_upload_connector = aiohttp.TCPConnector(
+            limit=200,
+            keepalive_timeout=settings.web3storage.idle_conn_timeout,
         )
-        self._web3_storage_upload_client = AsyncClient(
-            timeout=Timeout(timeout=settings.web3storage.timeout),
-            follow_redirects=False,
-            transport=self._web3_storage_upload_transport,
+        self._web3_storage_upload_client = aiohttp.ClientSession(
+            # per phase like the httpx timeout it replaces, connect also covers waiting for a pooled connection
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                connect=settings.web3storage.timeout,
+                sock_connect=settings.web3storage.timeout,
+                sock_read=settings.web3storage.timeout,
+            ),
+            connector=self._web3_storage_upload_connector,
             headers={'Authorization': 'Bearer ' + settings.web3storage.api_token},
         )
+        # uploads in flight, a max_idle_conns of 0 must not block every upload
+        self._web3_storage_sem = asyncio.Semaphore(max(1, settings.web3storage.max_idle_conns))
+
+    async def close(self):
+        """
+        Closes the aiohttp session used for web3 storage uploads.
+        """
+        if self.initialized:
+            await self._web3_storage_upload_client.close()
 
     async def _init_grpc(self):
         self._grpc_channel = Channel(
@@ -462,39 +508,30 @@ class GenericAsyncWorker:
             ssl=False,
         )
         self._grpc_stub = SubmissionStub(self._grpc_channel)
-        self._stream = None
-        self._cancel_task = None
+        # submissions are unary calls multiplexed as HTTP/2 streams over the channel's single connection,
+        # grpclib opens it on the first call and transparently reconnects if it is lost
 
     async def _init_protocol_meta(self):
-        # TODO: combine these into a single call
         try:
-            source_block_time = await self._anchor_rpc_helper.web3_call(
+            source_block_time, epoch_size = await self._anchor_rpc_helper.batch_eth_call(
                 [
-                    self.protocol_state_contract.functions.SOURCE_CHAIN_BLOCK_TIME(
-                        Web3.to_checksum_address(settings.data_market),
-                    ),
+                    (self._protocol_state_cs, '0x' + self._source_block_time_calldata.hex()),
+                    (self._protocol_state_cs, '0x' + self._epoch_size_calldata.hex()),
                 ],
             )
+            # both getters return a single uint word, anything else (e.g. empty 0x from a wrong address) is an error
+            for fn_name, result in (('SOURCE_CHAIN_BLOCK_TIME', source_block_time), ('EPOCH_SIZE', epoch_size)):
+                if len(result) != 32:
+                    raise ValueError(f'Unexpected {fn_name} return data of {len(result)} bytes: {result.hex()}')
         except Exception as e:
             self.logger.exception(
-                'Exception in querying protocol state for source chain block time: {}',
+                'Exception in querying protocol state for source chain block time and epoch size: {}',
                 e,
             )
         else:
-            source_block_time = source_block_time[0]
-            self._source_chain_block_time = source_block_time / 10 ** 4
+            self._source_chain_block_time = int.from_bytes(source_block_time, 'big') / 10 ** 4
             self.logger.debug('Set source chain block time to {}', self._source_chain_block_time)
-        try:
-            epoch_size = await self._anchor_rpc_helper.web3_call(
-                [self.protocol_state_contract.functions.EPOCH_SIZE(Web3.to_checksum_address(settings.data_market))],
-            )
-        except Exception as e:
-            self.logger.exception(
-                'Exception in querying protocol state for epoch size: {}',
-                e,
-            )
-        else:
-            self._epoch_size = epoch_size[0]
+            self._epoch_size = int.from_bytes(epoch_size, 'big')
             self.logger.debug('Set epoch size to {}', self._epoch_size)
 
     async def init(self):
@@ -502,6 +539,14 @@ class GenericAsyncWorker:
         Initializes the worker by initializing the HTTPX client, and RPC helper.
         """
         if not self.initialized:
+            # settings consulted on every submission, cached to keep attribute lookups off the hot path
+            self._ws_url = settings.web3storage.url + settings.web3storage.upload_url_suffix
+            self._ws_token = settings.web3storage.api_token
+            self._default_slot_id = settings.slot_id
+            self._deadline_buffer = settings.protocol_state.deadline_buffer
+            self._ipfs_enabled = bool(settings.ipfs.url)
+            if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+                self.logger.warning('uvloop is not installed as the event loop policy, running on the default asyncio loop')
             await self._init_httpx_client()
             await self._init_rpc_helper()
             await self._init_protocol_meta()
@@ -523,17 +568,16 @@ class GenericAsyncWorker:
             project_id (str): The ID of the project that missed the snapshot.
         """
         notification_message = SnapshotterIssue(
-            instanceID=settings.instance_id,
-            issueType=SnapshotterReportState.MISSED_SNAPSHOT.value,
+            **self._issue_template,
             projectID=project_id,
             epochId=str(epoch_id),
             timeOfReporting=str(time.time()),
-            extra=json.dumps({'issueDetails': f'Error : {error}'}),
+            extra=orjson.dumps({'issueDetails': f'Error : {error}'}).decode('utf-8'),
         )
 
         telegram_message = TelegramSnapshotterReportMessage(
             chatId=settings.reporting.telegram_chat_id,
-            slotId=settings.slot_id,
+            slotId=self._default_slot_id,
             issue=notification_message,
             status=self.status,
         )
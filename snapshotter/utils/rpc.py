@@ -3,6 +3,7 @@ from typing import List
 from typing import Union
 
 import eth_abi
+import orjson
 import tenacity
 from eth_abi.codec import ABICodec
 from eth_utils import keccak
@@ -499,7 +500,7 @@ class RpcHelper(object):
 
             try:
                 response = await self._client.post(url=rpc_url, json=rpc_query)
-                response_data = response.json()
+                response_data = orjson.loads(response.content)
             except Exception as e:
 
                 exc = RPCException(
@@ -729,6 +730,42 @@ class RpcHelper(object):
 
         return rpc_response
 
+    async def batch_eth_call(self, calls, block='latest'):
+        """
+        Batch executes multiple contract calls in a single JSON-RPC request and returns the raw HexBytes data.
+
+        Args:
+            calls (list): A list of (contract_address, calldata) tuples, calldata being the hex encoded call data.
+            block (str, optional): The block identifier to execute the calls against. Defaults to 'latest'.
+
+        Returns:
+            list: A list of raw HexBytes data results, in the same order as the calls.
+        """
+        if not self._initialized:
+            await self.init()
+
+        rpc_query = []
+        for request_id, (contract_address, calldata) in enumerate(calls, start=1):
+            rpc_query.append(
+                {
+                    'jsonrpc': '2.0',
+                    'method': 'eth_call',
+                    'params': [
+                        {
+                            'to': contract_address,
+                            'data': calldata,
+                        },
+                        block,
+                    ],
+                    'id': request_id,
+                },
+            )
+
+        response_data = await self._make_rpc_jsonrpc_call(rpc_query)
+        # batch responses are not guaranteed to preserve the request order
+        response = sorted(response_data, key=lambda r: r['id'])
+        return [HexBytes(result['result']) for result in response]
+
     async def batch_eth_get_block(self, from_block, to_block):
         """
         Batch retrieves Ethereum blocks using eth_getBlockByNumber JSON-RPC method.
@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 from typing import Optional
 
@@ -15,6 +16,7 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
     _ipfs_singleton: AsyncIPFSClientSingleton
     _ipfs_writer_client: AsyncIPFSClient
     _ipfs_reader_client: AsyncIPFSClient
+    _commit_semaphore: asyncio.Semaphore
 
     def __init__(self):
         """
@@ -109,6 +111,8 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
                 )
                 return
 
+            commit_project_ids = []
+            commit_tasks = []
             for project_data_source, snapshot in snapshots:
                 data_sources = project_data_source.split('_')
                 if len(data_sources) == 1:
@@ -120,15 +124,39 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
                 project_id = self._gen_project_id(
                     task_type=task_type, data_source=data_source, primary_data_source=primary_data_source,
                 )
-                await self._commit_payload(
-                    task_type=task_type,
-                    _ipfs_writer_client=self._ipfs_writer_client,
-                    project_id=project_id,
-                    epoch=msg_obj,
-                    snapshot=snapshot,
-                    storage_flag=settings.web3storage.upload_snapshots,
+                commit_project_ids.append(project_id)
+                commit_tasks.append(
+                    self._commit_payload_bounded(
+                        task_type=task_type,
+                        _ipfs_writer_client=self._ipfs_writer_client,
+                        project_id=project_id,
+                        epoch=msg_obj,
+                        snapshot=snapshot,
+                        storage_flag=settings.web3storage.upload_snapshots,
+                    ),
+                )
+            # submissions for the same epoch are independent, pipeline them over the multiplexed collector connection
+            results = await asyncio.gather(*commit_tasks, return_exceptions=True)
+            for project_id, result in zip(commit_project_ids, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if not isinstance(result, BaseException):
+                    continue
+                # _commit_payload counts and reports its own failures, anything escaping it was raised while doing so
+                self.logger.opt(exception=result).error(
+                    'Exception reporting failed snapshot commit for project {} in epoch: {}, Error: {}',
+                    project_id, msg_obj, result,
                 )
 
+    async def _commit_payload_bounded(self, **kwargs):
+        """
+        Commits a snapshot once a commit slot is free, see _commit_payload for the arguments.
+        """
+        # every commit holds an anchor chain RPC connection for the current block and an IPFS upload,
+        # so the per epoch fan-out is bounded by the anchor chain RPC connection pool size
+        async with self._commit_semaphore:
+            return await self._commit_payload(**kwargs)
+
     async def process_task(self, msg_obj: SnapshotProcessMessage, task_type: str, preloader_results: dict):
         """
         Process a SnapshotProcessMessage object for a given task type.
@@ -156,7 +184,7 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
             self._submission_window = await get_snapshot_submision_window(
                 rpc_helper=self._anchor_rpc_helper,
                 state_contract_obj=self.protocol_state_contract,
-                data_market=settings.data_market,
+                data_market=self._data_market_cs,
             )
 
         self.logger.debug(
@@ -211,4 +239,7 @@ class SnapshotAsyncWorker(GenericAsyncWorker):
         if not self.initialized:
             await self._init_project_calculation_mapping()
             await self._init_ipfs_client()
+            self._commit_semaphore = asyncio.Semaphore(
+                max(1, settings.anchor_chain_rpc.connection_limits.max_connections),
+            )
             await self.init()